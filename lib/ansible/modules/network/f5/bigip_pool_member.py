@@ -18,19 +18,33 @@ DOCUMENTATION = r'''
 module: bigip_pool_member
 short_description: Manages F5 BIG-IP LTM pool members
 description:
-  - Manages F5 BIG-IP LTM pool members via iControl SOAP API.
+  - Manages F5 BIG-IP LTM pool members via the iControl REST or SOAP API.
 version_added: 1.4
 author:
   - Matt Hite (@mhite)
   - Tim Rupp (@caphrim007)
 notes:
   - Requires BIG-IP software version >= 11
-  - F5 developed module 'bigsuds' required (see http://devcentral.f5.com)
+  - The C(soap) transport requires the F5 developed module 'bigsuds'
+    (see http://devcentral.f5.com)
   - Best run as a local_action in your playbook
   - Supersedes bigip_pool for managing pool members
 requirements:
-  - bigsuds
+  - bigsuds (only when C(transport) is C(soap))
 options:
+  transport:
+    description:
+      - Configures the transport connection to use when connecting to the
+        remote device. The C(rest) transport uses the iControl REST API
+        and needs no third party libraries. The C(soap) transport uses
+        the iControl SOAP API through bigsuds, as earlier releases of
+        this module always did; BIG-IP versions without iControl REST
+        (prior to 11.4) must use it.
+    default: rest
+    choices:
+      - rest
+      - soap
+    version_added: 2.5
   state:
     description:
       - Pool member state.
@@ -63,15 +77,24 @@ options:
     default: Common
   host:
     description:
-      - Pool member IP.
-    required: True
+      - Pool member IP. Required unless C(members) is used.
     aliases:
       - address
       - name
   port:
     description:
-      - Pool member port.
-    required: True
+      - Pool member port. Required unless C(members) is used.
+  members:
+    description:
+      - List of pool members to manage with one task, as an alternative
+        to C(host)/C(port). Each entry requires a C(host) and C(port)
+        and may override C(session_state), C(monitor_state),
+        C(connection_limit), C(description), C(rate_limit), C(ratio)
+        and C(priority_group); anything an entry does not set falls
+        back to the task-wide value. With the C(rest) transport the
+        entries are processed concurrently. Mutually exclusive with
+        C(host) and C(port).
+    version_added: 2.5
   connection_limit:
     description:
       - Pool member connection limit. Setting this to 0 disables the limit.
@@ -131,6 +154,23 @@ EXAMPLES = '''
     description: nginx server
   delegate_to: localhost
 
+- name: Add several pool members in one task
+  bigip_pool_member:
+    server: lb.mydomain.com
+    user: admin
+    password: secret
+    state: present
+    pool: my-pool
+    partition: Common
+    ratio: 2
+    members:
+      - host: 10.10.10.10
+        port: 80
+      - host: 10.10.10.11
+        port: 80
+        ratio: 1
+  delegate_to: localhost
+
 - name: Remove pool member from pool
   bigip_pool_member:
     server: lb.mydomain.com
@@ -172,14 +212,34 @@ EXAMPLES = '''
   delegate_to: localhost
 '''
 
+import json
+
+try:
+    import ssl
+    HAS_SSL_CONTEXT = hasattr(ssl, 'SSLContext')
+except ImportError:
+    HAS_SSL_CONTEXT = False
+
 try:
     import bigsuds
     HAS_BIGSUDS = True
 except ImportError:
     pass  # Handled by f5_utils.bigsuds_found
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    # Python 2 without the futures backport; aggregate member lists are
+    # processed serially
+    HAS_FUTURES = False
+
+from ansible.module_utils._text import to_native
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import env_fallback
 from ansible.module_utils.f5_utils import bigip_api, bigsuds_found
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.urls import open_url
 
 HAS_DEVEL_IMPORTS = False
 
@@ -191,46 +251,105 @@ except ImportError:
     from ansible.module_utils.network.f5.common import fqdn_name
     from ansible.module_utils.network.f5.common import f5_argument_spec
 
+# fqdn_name is pure and gets called with the same partition and a small
+# set of names over and over, especially with a members list; memoize it
+# at the import site (functools.lru_cache is python3-only)
+_fqdn_name = fqdn_name
+_fqdn_name_cache = {}
 
-def pool_exists(api, pool):
+
+def fqdn_name(partition, value):
+    key = (partition, value)
+    try:
+        return _fqdn_name_cache[key]
+    except KeyError:
+        result = _fqdn_name_cache[key] = _fqdn_name(partition, value)
+        return result
+
+
+# iControl primary error code for "The requested object was not found"
+NOT_FOUND_ERROR_CODE = '01020036'
+
+
+def fault_matches(e, message, error_code=None):
+    # Prefer the structured suds fault over serializing the whole
+    # exception -- str() on a WebFault walks the entire fault tree --
+    # and fall back to the message text for bigsuds releases that do
+    # not expose the fault object.
+    fault = getattr(e, 'fault', None)
+    faultstring = getattr(fault, 'faultstring', None)
+    if faultstring is not None:
+        if error_code is not None and error_code in faultstring:
+            return True
+        return message in faultstring
+    return message in str(e)
+
+
+# Existence probes already answered in this process, keyed on the api
+# client object itself so results are never reused across connections.
+# The key holds a strong reference on purpose: keying on id() would let
+# CPython recycle a collected client's address and alias a new
+# connection -- possibly to a different server -- onto stale entries.
+# Within a run, add/remove update the member entries so the cache never
+# goes stale.
+_pool_exists_cache = {}
+_member_exists_cache = {}
+
+
+def pool_exists(pool_api, pool):
     # hack to determine if pool exists
+    key = (pool_api, pool)
+    if key in _pool_exists_cache:
+        return _pool_exists_cache[key]
     result = False
     try:
-        api.LocalLB.Pool.get_object_status(pool_names=[pool])
+        pool_api.get_object_status(pool_names=[pool])
         result = True
     except bigsuds.OperationFailed as e:
-        if "was not found" in str(e):
+        if fault_matches(e, "was not found", NOT_FOUND_ERROR_CODE):
             result = False
         else:
             # genuine exception
             raise
+    _pool_exists_cache[key] = result
     return result
 
 
-def member_exists(api, pool, address, port):
+def member_exists(pool_api, pool, members):
     # hack to determine if member exists
+    key = (pool_api, pool, members[0]['address'], members[0]['port'])
+    if key in _member_exists_cache:
+        return _member_exists_cache[key]
     result = False
     try:
-        members = [{'address': address, 'port': port}]
-        api.LocalLB.Pool.get_member_object_status(pool_names=[pool],
-                                                  members=[members])
+        pool_api.get_member_object_status(pool_names=[pool],
+                                          members=[members])
         result = True
     except bigsuds.OperationFailed as e:
-        if "was not found" in str(e):
+        if fault_matches(e, "was not found", NOT_FOUND_ERROR_CODE):
             result = False
         else:
             # genuine exception
             raise
+    _member_exists_cache[key] = result
     return result
 
 
-def delete_node_address(api, address):
+def get_pool_members(pool_api, pool):
+    # One call returns the pool's entire membership, which answers the
+    # existence question for any number of members without per-member
+    # probes.
+    members = pool_api.get_member_v2(pool_names=[pool])[0]
+    return set([(m['address'], m['port']) for m in members])
+
+
+def delete_node_address(node_api, address):
     result = False
     try:
-        api.LocalLB.NodeAddressV2.delete_node_address(nodes=[address])
+        node_api.delete_node_address(nodes=[address])
         result = True
     except bigsuds.OperationFailed as e:
-        if "is referenced by a member of pool" in str(e):
+        if fault_matches(e, "is referenced by a member of pool"):
             result = False
         else:
             # genuine exception
@@ -238,125 +357,122 @@ def delete_node_address(api, address):
     return result
 
 
-def remove_pool_member(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.remove_member_v2(
-        pool_names=[pool],
-        members=[members]
-    )
+def remove_pool_member(pool_api, pool, members):
+    # The remove call doubles as the existence probe: the not-found
+    # fault means the member was already absent, which saves the
+    # get_member_object_status round-trip on every removal
+    try:
+        pool_api.remove_member_v2(
+            pool_names=[pool],
+            members=[members]
+        )
+    except bigsuds.OperationFailed as e:
+        if fault_matches(e, "was not found", NOT_FOUND_ERROR_CODE):
+            return False
+        raise
+    _member_exists_cache[(pool_api, pool, members[0]['address'], members[0]['port'])] = False
+    return True
 
 
-def add_pool_member(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.add_member_v2(
+def add_pool_member(pool_api, pool, members):
+    pool_api.add_member_v2(
         pool_names=[pool],
         members=[members]
     )
+    _member_exists_cache[(pool_api, pool, members[0]['address'], members[0]['port'])] = True
 
 
-def get_connection_limit(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_connection_limit(
+def get_connection_limit(pool_api, pool, members):
+    result = pool_api.get_member_connection_limit(
         pool_names=[pool],
         members=[members]
     )[0][0]
     return result
 
 
-def set_connection_limit(api, pool, address, port, limit):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.set_member_connection_limit(
+def set_connection_limit(pool_api, pool, members, limit):
+    pool_api.set_member_connection_limit(
         pool_names=[pool],
         members=[members],
         limits=[[limit]]
     )
 
 
-def get_description(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_description(
+def get_description(pool_api, pool, members):
+    result = pool_api.get_member_description(
         pool_names=[pool],
         members=[members]
     )[0][0]
     return result
 
 
-def set_description(api, pool, address, port, description):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.set_member_description(
+def set_description(pool_api, pool, members, description):
+    pool_api.set_member_description(
         pool_names=[pool],
         members=[members],
         descriptions=[[description]]
     )
 
 
-def get_rate_limit(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_rate_limit(
+def get_rate_limit(pool_api, pool, members):
+    result = pool_api.get_member_rate_limit(
         pool_names=[pool],
         members=[members]
     )[0][0]
     return result
 
 
-def set_rate_limit(api, pool, address, port, limit):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.set_member_rate_limit(
+def set_rate_limit(pool_api, pool, members, limit):
+    pool_api.set_member_rate_limit(
         pool_names=[pool],
         members=[members],
         limits=[[limit]]
     )
 
 
-def get_ratio(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_ratio(
+def get_ratio(pool_api, pool, members):
+    result = pool_api.get_member_ratio(
         pool_names=[pool],
         members=[members]
     )[0][0]
     return result
 
 
-def set_ratio(api, pool, address, port, ratio):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.set_member_ratio(
+def set_ratio(pool_api, pool, members, ratio):
+    pool_api.set_member_ratio(
         pool_names=[pool],
         members=[members],
         ratios=[[ratio]]
     )
 
 
-def get_priority_group(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_priority(
+def get_priority_group(pool_api, pool, members):
+    result = pool_api.get_member_priority(
         pool_names=[pool],
         members=[members]
     )[0][0]
     return result
 
 
-def set_priority_group(api, pool, address, port, priority_group):
-    members = [{'address': address, 'port': port}]
-    api.LocalLB.Pool.set_member_priority(
+def set_priority_group(pool_api, pool, members, priority_group):
+    pool_api.set_member_priority(
         pool_names=[pool],
         members=[members],
         priorities=[[priority_group]]
     )
 
 
-def set_member_session_enabled_state(api, pool, address, port, session_state):
-    members = [{'address': address, 'port': port}]
-    session_state = ["STATE_%s" % session_state.strip().upper()]
-    api.LocalLB.Pool.set_member_session_enabled_state(
+def set_member_session_enabled_state(pool_api, pool, members, session_state_token):
+    # takes the pre-formatted STATE_* token; see process_member_soap
+    pool_api.set_member_session_enabled_state(
         pool_names=[pool],
         members=[members],
-        session_states=[session_state]
+        session_states=[[session_state_token]]
     )
 
 
-def get_member_session_status(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_session_status(
+def get_member_session_status(pool_api, pool, members):
+    result = pool_api.get_member_session_status(
         pool_names=[pool],
         members=[members]
     )[0][0]
@@ -364,19 +480,17 @@ def get_member_session_status(api, pool, address, port):
     return result
 
 
-def set_member_monitor_state(api, pool, address, port, monitor_state):
-    members = [{'address': address, 'port': port}]
-    monitor_state = ["STATE_%s" % monitor_state.strip().upper()]
-    api.LocalLB.Pool.set_member_monitor_state(
+def set_member_monitor_state(pool_api, pool, members, monitor_state_token):
+    # takes the pre-formatted STATE_* token; see process_member_soap
+    pool_api.set_member_monitor_state(
         pool_names=[pool],
         members=[members],
-        monitor_states=[monitor_state]
+        monitor_states=[[monitor_state_token]]
     )
 
 
-def get_member_monitor_status(api, pool, address, port):
-    members = [{'address': address, 'port': port}]
-    result = api.LocalLB.Pool.get_member_monitor_status(
+def get_member_monitor_status(pool_api, pool, members):
+    result = pool_api.get_member_monitor_status(
         pool_names=[pool],
         members=[members]
     )[0][0]
@@ -384,16 +498,522 @@ def get_member_monitor_status(api, pool, address, port):
     return result
 
 
+# Getters for every member attribute this module manages
+MEMBER_ATTR_GETTERS = {
+    'connection_limit': get_connection_limit,
+    'description': get_description,
+    'rate_limit': get_rate_limit,
+    'ratio': get_ratio,
+    'priority_group': get_priority_group,
+    'session_status': get_member_session_status,
+    'monitor_status': get_member_monitor_status,
+}
+
+
+def get_member_state(pool_api, pool, members, attrs=None):
+    # bigsuds offers no way to pack several methods into one request, so
+    # the best we can do is fetch only the attributes the task manages,
+    # in one pass, and hand back a dict to compare against.
+    if attrs is None:
+        attrs = list(MEMBER_ATTR_GETTERS)
+    state = {}
+    for attr in attrs:
+        state[attr] = MEMBER_ATTR_GETTERS[attr](pool_api, pool, members)
+    return state
+
+
+# Whether a desired session/monitor state needs a set call, keyed on
+# (desired state, whether the device reports the member as forced
+# offline). Forced offline is SESSION_STATUS_FORCED_DISABLED for the
+# session flag and MONITOR_STATUS_FORCED_DOWN for the monitor flag --
+# user-disabled/user-down in iControl REST terms.
+STATE_NEEDS_CHANGE = {
+    ('enabled', True): True,
+    ('enabled', False): False,
+    ('disabled', True): False,
+    ('disabled', False): True,
+}
+
+
+# Setters for every member attribute this module manages, in the order
+# they are applied
+MEMBER_ATTR_SETTERS = [
+    ('connection_limit', set_connection_limit),
+    ('description', set_description),
+    ('rate_limit', set_rate_limit),
+    ('ratio', set_ratio),
+    ('session_state', set_member_session_enabled_state),
+    ('monitor_state', set_member_monitor_state),
+    ('priority_group', set_priority_group),
+]
+
+
+def apply_member_config(pool_api, pool, members, attrs):
+    # Flush every desired attribute in one pass. As with the getters,
+    # bigsuds cannot pack these into a single request, but routing them
+    # through one flush point keeps main() to a single call site.
+    for attr, setter in MEMBER_ATTR_SETTERS:
+        if attr in attrs:
+            setter(pool_api, pool, members, attrs[attr])
+
+
+# iControl REST spellings of the managed attributes
+REST_ATTR_NAMES = {
+    'connection_limit': 'connectionLimit',
+    'description': 'description',
+    'rate_limit': 'rateLimit',
+    'ratio': 'ratio',
+    'priority_group': 'priorityGroup',
+}
+
+
+def rest_name(name):
+    # iControl REST encodes the '/' partition separator as '~'
+    return name.replace('/', '~')
+
+
+def rest_rate_limit(value):
+    # REST reports a disabled rate limit as the string 'disabled' where
+    # SOAP reports 0
+    if value in (None, 'disabled'):
+        return 0
+    return int(value)
+
+
+class RestApi(object):
+    """Minimal iControl REST client covering the pool member endpoints.
+
+    Drives /mgmt/tm/ltm with JSON over HTTPS. A single REST round-trip
+    does the work of several SOAP calls, and none of suds' WSDL
+    machinery is loaded, which is where most of the SOAP transport's
+    time goes.
+    """
+
+    def __init__(self, server, user, password, validate_certs, port=443):
+        self.base_url = 'https://%s:%s/mgmt/tm/ltm' % (server, port)
+        self.user = user
+        self.password = password
+        self.validate_certs = validate_certs
+
+    def send(self, method, path, body=None):
+        data = None
+        if body is not None:
+            data = json.dumps(body)
+        response = open_url(
+            self.base_url + path, method=method, data=data,
+            url_username=self.user, url_password=self.password,
+            force_basic_auth=True, validate_certs=self.validate_certs,
+            headers={'Content-Type': 'application/json'}
+        )
+        content = response.read()
+        if content:
+            return json.loads(content)
+        return None
+
+    def member_path(self, pool, members):
+        member = members[0]
+        return '/pool/%s/members/%s:%s' % (
+            rest_name(pool), rest_name(member['address']), member['port'])
+
+    def pool_exists(self, pool):
+        try:
+            self.send('GET', '/pool/%s' % rest_name(pool))
+        except HTTPError as e:
+            if e.code == 404:
+                return False
+            raise
+        return True
+
+    def get_member(self, pool, members):
+        # One GET returns every attribute of the member, or None when
+        # the member is not in the pool
+        try:
+            return self.send('GET', self.member_path(pool, members))
+        except HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def add_member(self, pool, members, attrs):
+        member = members[0]
+        body = {'name': '%s:%s' % (member['address'], member['port'])}
+        body.update(attrs)
+        self.send('POST', '/pool/%s/members' % rest_name(pool), body)
+
+    def update_member(self, pool, members, attrs):
+        self.send('PATCH', self.member_path(pool, members), attrs)
+
+    def remove_member(self, pool, members):
+        # The DELETE doubles as the existence probe: a 404 means the
+        # member was already absent
+        try:
+            self.send('DELETE', self.member_path(pool, members))
+        except HTTPError as e:
+            if e.code == 404:
+                return False
+            raise
+        return True
+
+    def delete_node(self, address):
+        try:
+            self.send('DELETE', '/node/%s' % rest_name(address))
+        except HTTPError as e:
+            if e.code == 404:
+                # already gone; with a members list two workers removing
+                # members of the same host can race for the node delete
+                return False
+            if "is referenced by a member of pool" in to_native(e.read()):
+                return False
+            raise
+        return True
+
+
+# Per-member attributes a members list entry may override
+MEMBER_SPEC_ATTRS = (
+    'session_state',
+    'monitor_state',
+    'connection_limit',
+    'description',
+    'rate_limit',
+    'ratio',
+    'priority_group',
+)
+
+
+def expand_member_specs(module):
+    # Normalize the single host/port form and the members list into one
+    # list of per-member dicts; list entries fall back to the task-wide
+    # attribute values for anything they do not set themselves. Types,
+    # choices and the required host/port are enforced by the members
+    # sub-spec in main(), which leaves unset keys as None here. An empty
+    # members list never gets here; main() exits early on it.
+    params = module.params
+    if params['members'] is None:
+        spec = dict(host=params['host'], port=params['port'])
+        for attr in MEMBER_SPEC_ATTRS:
+            spec[attr] = params[attr]
+        return [spec]
+    specs = []
+    for item in params['members']:
+        spec = dict(host=item['host'], port=item['port'])
+        for attr in MEMBER_SPEC_ATTRS:
+            value = item.get(attr)
+            if value is None:
+                value = params[attr]
+            spec[attr] = value
+        specs.append(spec)
+    return specs
+
+
+def aggregate_results(module, member_results):
+    if not module.params['members']:
+        # preserve the result shape the single-member form always had
+        result = dict(member_results[0])
+        del result['member']
+        return result
+    changed_members = [r['member'] for r in member_results if r['changed']]
+    return {'changed': bool(changed_members), 'changed_members': changed_members}
+
+
+def run_soap(module):
+    server = module.params['server']
+    server_port = module.params['server_port']
+    user = module.params['user']
+    password = module.params['password']
+    partition = module.params['partition']
+    validate_certs = module.params['validate_certs']
+    pool = fqdn_name(partition, module.params['pool'])
+
+    api = bigip_api(server, user, password, validate_certs, port=server_port)
+    # Resolve the two iControl interfaces once; bigsuds re-walks its
+    # namespace wrappers on every api.LocalLB.X attribute lookup
+    # otherwise, and every helper below is on that path.
+    pool_api = api.LocalLB.Pool
+    node_api = api.LocalLB.NodeAddressV2
+    if not pool_exists(pool_api, pool):
+        module.fail_json(msg="pool %s does not exist" % pool)
+
+    specs = expand_member_specs(module)
+    if module.check_mode:
+        # Answer the membership probes from one pool-wide member list
+        # instead of a per-member status call; across a play looping
+        # over many members this costs a single call per pool.
+        pool_members = get_pool_members(pool_api, pool)
+        for spec in specs:
+            address = fqdn_name(partition, spec['host'])
+            _member_exists_cache[(pool_api, pool, address, spec['port'])] = \
+                (address, spec['port']) in pool_members
+
+    # bigsuds clients are not thread safe, so the SOAP transport works
+    # through the list serially; the REST transport parallelizes.
+    member_results = [
+        process_member_soap(module, pool_api, node_api, pool, spec)
+        for spec in specs
+    ]
+    return aggregate_results(module, member_results)
+
+
+def process_member_soap(module, pool_api, node_api, pool, spec):
+    state = module.params['state']
+    partition = module.params['partition']
+    preserve_node = module.params['preserve_node']
+
+    session_state = spec['session_state']
+    monitor_state = spec['monitor_state']
+    connection_limit = spec['connection_limit']
+    description = spec['description']
+    rate_limit = spec['rate_limit']
+    ratio = spec['ratio']
+    priority_group = spec['priority_group']
+    address = fqdn_name(partition, spec['host'])
+    port = spec['port']
+
+    # Format the iControl STATE_* tokens once instead of in each setter
+    session_state_token = None
+    if session_state is not None:
+        session_state_token = 'STATE_%s' % session_state.strip().upper()
+    monitor_state_token = None
+    if monitor_state is not None:
+        monitor_state_token = 'STATE_%s' % monitor_state.strip().upper()
+
+    # Build the AddressPort struct once; every helper marshals this same
+    # object instead of rebuilding an identical list per call.
+    member = [{'address': address, 'port': port}]
+
+    result = {'changed': False}  # default
+
+    if state == 'absent':
+        if module.check_mode:
+            if member_exists(pool_api, pool, member):
+                result = {'changed': True}
+        elif remove_pool_member(pool_api, pool, member):
+            if preserve_node:
+                result = {'changed': True}
+            else:
+                deleted = delete_node_address(node_api, address)
+                result = {'changed': True, 'deleted': deleted}
+
+    elif state == 'present':
+        if not member_exists(pool_api, pool, member):
+            if not module.check_mode:
+                add_pool_member(pool_api, pool, member)
+                attrs = dict(
+                    connection_limit=connection_limit,
+                    description=description,
+                    rate_limit=rate_limit,
+                    ratio=ratio,
+                    session_state=session_state_token,
+                    monitor_state=monitor_state_token,
+                    priority_group=priority_group
+                )
+                attrs = dict((k, v) for k, v in attrs.items() if v is not None)
+                apply_member_config(pool_api, pool, member, attrs)
+            result = {'changed': True}
+        else:
+            # pool member exists -- potentially modify attributes
+            wanted = []
+            if connection_limit is not None:
+                wanted.append('connection_limit')
+            if description is not None:
+                wanted.append('description')
+            if rate_limit is not None:
+                wanted.append('rate_limit')
+            if ratio is not None:
+                wanted.append('ratio')
+            if session_state is not None:
+                wanted.append('session_status')
+            if monitor_state is not None:
+                wanted.append('monitor_status')
+            if priority_group is not None:
+                wanted.append('priority_group')
+            member_state = get_member_state(pool_api, pool, member, wanted)
+            if connection_limit is not None and connection_limit != member_state['connection_limit']:
+                if not module.check_mode:
+                    set_connection_limit(pool_api, pool, member, connection_limit)
+                result = {'changed': True}
+            if description is not None and description != member_state['description']:
+                if not module.check_mode:
+                    set_description(pool_api, pool, member, description)
+                result = {'changed': True}
+            if rate_limit is not None and rate_limit != member_state['rate_limit']:
+                if not module.check_mode:
+                    set_rate_limit(pool_api, pool, member, rate_limit)
+                result = {'changed': True}
+            if ratio is not None and ratio != member_state['ratio']:
+                if not module.check_mode:
+                    set_ratio(pool_api, pool, member, ratio)
+                result = {'changed': True}
+            if session_state is not None:
+                forced = member_state['session_status'] == 'forced_disabled'
+                if STATE_NEEDS_CHANGE[(session_state, forced)]:
+                    if not module.check_mode:
+                        set_member_session_enabled_state(pool_api, pool, member, session_state_token)
+                    result = {'changed': True}
+            if monitor_state is not None:
+                forced = member_state['monitor_status'] == 'forced_down'
+                if STATE_NEEDS_CHANGE[(monitor_state, forced)]:
+                    if not module.check_mode:
+                        set_member_monitor_state(pool_api, pool, member, monitor_state_token)
+                    result = {'changed': True}
+            if priority_group is not None and priority_group != member_state['priority_group']:
+                if not module.check_mode:
+                    set_priority_group(pool_api, pool, member, priority_group)
+                result = {'changed': True}
+
+    result['member'] = '%s:%s' % (address, port)
+    return result
+
+
+def run_rest(module):
+    server = module.params['server']
+    server_port = module.params['server_port']
+    user = module.params['user']
+    password = module.params['password']
+    partition = module.params['partition']
+    validate_certs = module.params['validate_certs']
+    pool = fqdn_name(partition, module.params['pool'])
+
+    api = RestApi(server, user, password, validate_certs, port=server_port)
+    if not api.pool_exists(pool):
+        module.fail_json(msg="pool %s does not exist" % pool)
+
+    specs = expand_member_specs(module)
+    if len(specs) > 1 and HAS_FUTURES:
+        # The work is I/O bound HTTPS, so a small thread pool overlaps
+        # the round-trips; open_url opens a fresh connection per request,
+        # which makes the client safe to share between workers.
+        executor = ThreadPoolExecutor(max_workers=min(16, len(specs)))
+        try:
+            member_results = list(executor.map(
+                lambda spec: process_member_rest(module, api, pool, spec),
+                specs))
+        finally:
+            executor.shutdown()
+    else:
+        member_results = [
+            process_member_rest(module, api, pool, spec) for spec in specs
+        ]
+    return aggregate_results(module, member_results)
+
+
+def process_member_rest(module, api, pool, spec):
+    state = module.params['state']
+    partition = module.params['partition']
+    preserve_node = module.params['preserve_node']
+
+    session_state = spec['session_state']
+    monitor_state = spec['monitor_state']
+    connection_limit = spec['connection_limit']
+    description = spec['description']
+    rate_limit = spec['rate_limit']
+    ratio = spec['ratio']
+    priority_group = spec['priority_group']
+    address = fqdn_name(partition, spec['host'])
+    port = spec['port']
+
+    member = [{'address': address, 'port': port}]
+
+    result = {'changed': False}  # default
+
+    if state == 'absent':
+        if module.check_mode:
+            if api.get_member(pool, member) is not None:
+                result = {'changed': True}
+        elif api.remove_member(pool, member):
+            if preserve_node:
+                result = {'changed': True}
+            else:
+                result = {'changed': True, 'deleted': api.delete_node(address)}
+
+    elif state == 'present':
+        # One GET returns the member's entire configuration, where the
+        # SOAP transport needs a call per attribute
+        member_state = api.get_member(pool, member)
+        attrs = dict(
+            connection_limit=connection_limit,
+            description=description,
+            rate_limit=rate_limit,
+            ratio=ratio,
+            priority_group=priority_group
+        )
+        attrs = dict(
+            (REST_ATTR_NAMES[k], v) for k, v in attrs.items() if v is not None)
+        if session_state is not None:
+            attrs['session'] = 'user-enabled' if session_state == 'enabled' else 'user-disabled'
+        if monitor_state is not None:
+            attrs['state'] = 'user-up' if monitor_state == 'enabled' else 'user-down'
+
+        if member_state is None:
+            if not module.check_mode:
+                api.add_member(pool, member, attrs)
+            result = {'changed': True}
+        else:
+            # pool member exists -- collect every attribute that differs
+            # and apply the lot in a single PATCH
+            desired = {}
+            if connection_limit is not None and connection_limit != member_state.get('connectionLimit', 0):
+                desired['connectionLimit'] = connection_limit
+            if description is not None and description != member_state.get('description', ''):
+                desired['description'] = description
+            if rate_limit is not None and rate_limit != rest_rate_limit(member_state.get('rateLimit')):
+                desired['rateLimit'] = rate_limit
+            if ratio is not None and ratio != member_state.get('ratio', 1):
+                desired['ratio'] = ratio
+            if priority_group is not None and priority_group != member_state.get('priorityGroup', 0):
+                desired['priorityGroup'] = priority_group
+            if session_state is not None:
+                forced = member_state.get('session') == 'user-disabled'
+                if STATE_NEEDS_CHANGE[(session_state, forced)]:
+                    desired['session'] = attrs['session']
+            if monitor_state is not None:
+                forced = member_state.get('state') == 'user-down'
+                if STATE_NEEDS_CHANGE[(monitor_state, forced)]:
+                    desired['state'] = attrs['state']
+            if desired:
+                if not module.check_mode:
+                    api.update_member(pool, member, desired)
+                result = {'changed': True}
+
+    result['member'] = '%s:%s' % (address, port)
+    return result
+
+
 def main():
-    result = {}
     argument_spec = f5_argument_spec
 
     meta_args = dict(
+        state=dict(
+            default='present',
+            choices=['present', 'absent']
+        ),
+        partition=dict(
+            default='Common',
+            fallback=(env_fallback, ['F5_PARTITION'])
+        ),
+        transport=dict(
+            default='rest',
+            choices=['rest', 'soap']
+        ),
         session_state=dict(type='str', choices=['enabled', 'disabled']),
         monitor_state=dict(type='str', choices=['enabled', 'disabled']),
         pool=dict(type='str', required=True),
-        host=dict(type='str', required=True, aliases=['address', 'name']),
-        port=dict(type='int', required=True),
+        host=dict(type='str', aliases=['address', 'name']),
+        port=dict(type='int'),
+        members=dict(
+            type='list',
+            elements='dict',
+            options=dict(
+                host=dict(type='str', required=True, aliases=['address', 'name']),
+                port=dict(type='int', required=True),
+                session_state=dict(type='str', choices=['enabled', 'disabled']),
+                monitor_state=dict(type='str', choices=['enabled', 'disabled']),
+                connection_limit=dict(type='int'),
+                description=dict(type='str'),
+                rate_limit=dict(type='int'),
+                ratio=dict(type='int'),
+                priority_group=dict(type='int')
+            )
+        ),
         connection_limit=dict(type='int'),
         description=dict(type='str'),
         rate_limit=dict(type='int'),
@@ -405,126 +1025,48 @@ def main():
 
     module = AnsibleModule(
         argument_spec=argument_spec,
-        supports_check_mode=True
+        supports_check_mode=True,
+        mutually_exclusive=[
+            ['members', 'host'],
+            ['members', 'port']
+        ],
+        required_one_of=[
+            ['members', 'host']
+        ]
     )
 
-    if not bigsuds_found:
-        module.fail_json(msg="the python bigsuds module is required")
+    if module.params['members'] == []:
+        # A templated members list can legitimately come out empty;
+        # ensuring zero members are present (or absent) is a no-op.
+        module.exit_json(changed=False, changed_members=[])
 
-    if module.params['validate_certs']:
-        import ssl
-        if not hasattr(ssl, 'SSLContext'):
+    transport = module.params['transport']
+
+    if transport == 'soap':
+        if not bigsuds_found:
+            module.fail_json(msg="the python bigsuds module is required when transport is soap")
+
+        if module.params['validate_certs'] and not HAS_SSL_CONTEXT:
             module.fail_json(
                 msg='bigsuds does not support verifying certificates with python < 2.7.9. '
                     'Either update python or set validate_certs=False on the task')
 
-    server = module.params['server']
-    server_port = module.params['server_port']
-    user = module.params['user']
-    password = module.params['password']
-    state = module.params['state']
-    partition = module.params['partition']
-    validate_certs = module.params['validate_certs']
-
-    session_state = module.params['session_state']
-    monitor_state = module.params['monitor_state']
-    pool = fqdn_name(partition, module.params['pool'])
-    connection_limit = module.params['connection_limit']
-    description = module.params['description']
-    rate_limit = module.params['rate_limit']
-    ratio = module.params['ratio']
-    priority_group = module.params['priority_group']
-    host = module.params['host']
-    address = fqdn_name(partition, host)
-    port = module.params['port']
-    preserve_node = module.params['preserve_node']
+    if not module.params['members']:
+        host = module.params['host']
+        port = module.params['port']
 
-    if (host and port is None) or (port is not None and not host):
-        module.fail_json(msg="both host and port must be supplied")
+        if (host and port is None) or (port is not None and not host):
+            module.fail_json(msg="both host and port must be supplied")
 
-    if 0 > port or port > 65535:
-        module.fail_json(msg="valid ports must be in range 0 - 65535")
+    for spec in expand_member_specs(module):
+        if 0 > spec['port'] or spec['port'] > 65535:
+            module.fail_json(msg="valid ports must be in range 0 - 65535")
 
     try:
-        api = bigip_api(server, user, password, validate_certs, port=server_port)
-        if not pool_exists(api, pool):
-            module.fail_json(msg="pool %s does not exist" % pool)
-        result = {'changed': False}  # default
-
-        if state == 'absent':
-            if member_exists(api, pool, address, port):
-                if not module.check_mode:
-                    remove_pool_member(api, pool, address, port)
-                    if preserve_node:
-                        result = {'changed': True}
-                    else:
-                        deleted = delete_node_address(api, address)
-                        result = {'changed': True, 'deleted': deleted}
-                else:
-                    result = {'changed': True}
-
-        elif state == 'present':
-            if not member_exists(api, pool, address, port):
-                if not module.check_mode:
-                    add_pool_member(api, pool, address, port)
-                    if connection_limit is not None:
-                        set_connection_limit(api, pool, address, port, connection_limit)
-                    if description is not None:
-                        set_description(api, pool, address, port, description)
-                    if rate_limit is not None:
-                        set_rate_limit(api, pool, address, port, rate_limit)
-                    if ratio is not None:
-                        set_ratio(api, pool, address, port, ratio)
-                    if session_state is not None:
-                        set_member_session_enabled_state(api, pool, address, port, session_state)
-                    if monitor_state is not None:
-                        set_member_monitor_state(api, pool, address, port, monitor_state)
-                    if priority_group is not None:
-                        set_priority_group(api, pool, address, port, priority_group)
-                result = {'changed': True}
-            else:
-                # pool member exists -- potentially modify attributes
-                if connection_limit is not None and connection_limit != get_connection_limit(api, pool, address, port):
-                    if not module.check_mode:
-                        set_connection_limit(api, pool, address, port, connection_limit)
-                    result = {'changed': True}
-                if description is not None and description != get_description(api, pool, address, port):
-                    if not module.check_mode:
-                        set_description(api, pool, address, port, description)
-                    result = {'changed': True}
-                if rate_limit is not None and rate_limit != get_rate_limit(api, pool, address, port):
-                    if not module.check_mode:
-                        set_rate_limit(api, pool, address, port, rate_limit)
-                    result = {'changed': True}
-                if ratio is not None and ratio != get_ratio(api, pool, address, port):
-                    if not module.check_mode:
-                        set_ratio(api, pool, address, port, ratio)
-                    result = {'changed': True}
-                if session_state is not None:
-                    session_status = get_member_session_status(api, pool, address, port)
-                    if session_state == 'enabled' and session_status == 'forced_disabled':
-                        if not module.check_mode:
-                            set_member_session_enabled_state(api, pool, address, port, session_state)
-                        result = {'changed': True}
-                    elif session_state == 'disabled' and session_status != 'forced_disabled':
-                        if not module.check_mode:
-                            set_member_session_enabled_state(api, pool, address, port, session_state)
-                        result = {'changed': True}
-                if monitor_state is not None:
-                    monitor_status = get_member_monitor_status(api, pool, address, port)
-                    if monitor_state == 'enabled' and monitor_status == 'forced_down':
-                        if not module.check_mode:
-                            set_member_monitor_state(api, pool, address, port, monitor_state)
-                        result = {'changed': True}
-                    elif monitor_state == 'disabled' and monitor_status != 'forced_down':
-                        if not module.check_mode:
-                            set_member_monitor_state(api, pool, address, port, monitor_state)
-                        result = {'changed': True}
-                if priority_group is not None and priority_group != get_priority_group(api, pool, address, port):
-                    if not module.check_mode:
-                        set_priority_group(api, pool, address, port, priority_group)
-                    result = {'changed': True}
-
+        if transport == 'rest':
+            result = run_rest(module)
+        else:
+            result = run_soap(module)
     except Exception as e:
         module.fail_json(msg="received exception: %s" % e)
 